@@ -1,16 +1,92 @@
 #!/usr/bin/python3
 
+import functools
+import logging
+import threading
 import time
 import re
 import warnings
 import praw
-import shelve
-import traceback
-from airtable.airtable import Airtable
-from airtable import airtable
+import requests
+import sqlite3
+
+# Hyperscan is a multi-pattern DFA engine that scans a token against every ink
+# regex in one pass.  It is optional, without it we fall back to the combined
+# re pattern which is still a single call per token.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# pyahocorasick gives us a cheap substring automaton over the brand literals at
+# the front of each ink regex, used to rule tokens out before the regex scan.
+# Optional just like hyperscan.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Google RE2 (pip install google-re2) matches in guaranteed linear time and is
+# much faster than re on big alternations.  Drop-in re API, and optional too.
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 warnings.simplefilter('ignore')
 
+# Leading run of plain literal characters in an ink regex, i.e. the brand name
+_LITERAL_PREFIX_RE = re.compile(r"^[A-Za-z0-9' -]+")
+
+# Escapes like \S or \B change meaning if the pattern is lowercased, so patterns
+# containing one keep their own inline (?i:...) instead of being lowered
+_ESCAPE_LETTER_RE = re.compile(r'\\[A-Za-z]')
+
+# Constructs that cannot share a fused alternation: numbered backreferences
+# renumber when patterns are joined, and named groups or (?P=...) refs collide
+# across rows.  Patterns containing one are compiled and scanned on their own.
+_UNFUSABLE_RE = re.compile(r'\\[1-9]|\\g<|\(\?P[<=]')
+
+# Compile the [[ink name]] token regex once at import, the per-call re.findall/re.search
+# path has to hit the re module's pattern cache on every streamed comment otherwise
+_TOKEN_RE = re.compile(r"\[\[.*?\]\]")
+
+# Deletion table for stripping backslashes out of comment bodies
+_STRIP_BACKSLASH = str.maketrans('', '', '\\')
+
+# All debug chatter goes through logging now.  With the level above DEBUG every
+# call below is a single isEnabledFor check, so the hot path pays almost nothing;
+# the run script decides where (and how buffered) the records actually go.
+log = logging.getLogger("inkbot")
+
+# Keeps track of which comments we have already replied to.  This used to be a shelve
+# (dbm + pickle), which was slow to sync and re-wrote the whole file on every reply.
+# A one-table SQLite db in WAL mode does the same job with cheap durable writes, and
+# this class keeps the little bit of mapping interface the bot uses.
+class PostListDB:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS replied (id TEXT PRIMARY KEY, reply_id TEXT)')
+
+    def __contains__(self, sid):
+        row = self._conn.execute('SELECT 1 FROM replied WHERE id=?', (sid,)).fetchone()
+        return row is not None
+
+    def __setitem__(self, sid, reply_id):
+        # autocommit connection, so the insert is durable on its own
+        self._conn.execute('INSERT OR REPLACE INTO replied VALUES (?, ?)',
+                           (sid, str(reply_id)))
+
+    def keys(self):
+        return [row[0] for row in self._conn.execute('SELECT id FROM replied')]
+
+    def close(self):
+        self._conn.close()
+
+
 # This is a class for inkbot find and respond with a link to an image of an ink
 # On init, this class needs:
 #     a Reddit User Name, Password, User Agent, and subreddit
@@ -31,13 +107,16 @@ class InkBot:
                  at_table,
                  limit=1000,
                  wait_time = 60,
+                 refresh_interval = 3600,
                  version = 4,
                  debug=False ):
 
         self.debug = debug
+        # keep the old debug flag working: it just drops the logger to DEBUG
+        if debug:
+            log.setLevel(logging.DEBUG)
 
-        if self.debug:
-            print("Setting up Inkbot....")
+        log.debug("Setting up Inkbot....")
 
         self.user_agent    = user_agent
         self.user_name     = user_name
@@ -50,158 +129,434 @@ class InkBot:
         self.subreddit     = subreddit
         self.limit         = limit
         self.wait_time     = wait_time
+        self.refresh_interval = refresh_interval
         self.version       = version
 
 
     # Start things up
     def start(self):
-        if self.debug:
-            print("Inkbot Logging into Reddit...")
+        log.debug("Inkbot Logging into Reddit...")
         self.__login()
 
-        if self.debug:
-            print("Getting Inks from Airtable...")
+        log.debug("Getting Inks from Airtable...")
         # Populate the Ink table from Airtable
         self.inklist = self.__get_inklist()
 
-        if self.debug:
-            print("Getting replied to posts from db...")
+        log.debug("Compiling ink regexes...")
+        # Fuse all of the ink regexes into one matcher, see __compile_inklist
+        self._find_cached = self.__compile_inklist(self.inklist)
+
+        log.debug("Getting replied to posts from db...")
         # open up our comment database
-        self.PostList = shelve.open('inkbot_list.db')
+        self.PostList = PostListDB('inkbot_list.sqlite3')
+        # Keep the replied-to ids in a set as well, so the every-comment "have we
+        # done this one" check is a hash probe instead of a read from the db file
+        self._replied = set(self.PostList.keys())
+
+        # Re-download the inklist in the background every refresh_interval seconds,
+        # so Airtable edits get picked up without restarting the bot
+        if self.refresh_interval:
+            refresher = threading.Thread(target=self.__refresh_inklist_loop, daemon=True)
+            refresher.start()
 
-        if self.debug:
-            print("Going into Main Loop...")
+        log.debug("Going into Main Loop...")
         self.__inkbot_loop()
      
     # Login to Reddit
     def __login(self):
-        try:
-            self.r = praw.Reddit(client_id = self.client_id,
-                                 client_secret = self.client_secret,
-                                 password = self.user_pass,
-                                 user_agent = self.user_agent,
-                                 username = self.user_name)
-            if self.debug:
-                print(self.r.user.me())
-        except Exception as e:
-            self.___handle_exception(e)
-
-# Handle our exceptions.  This is the point where when things go bad we come.  What we are doing here is
-# a bit of cleanup, and then we are sleeping the wait time passed in at init.  After that we are trying to
-# restart things.   Hopefully this will happen until reddit is responsive again
-    def ___handle_exception(self, e):
-        if self.debug:
-            traceback.print_exc()
-            print("Inkbot had an Error: {}, going to try and continue".format(e))
-        self.PostList.close()
-        time.sleep(self.wait_time)
-        self.start()
-        exit()
-
-# This is a function to get the inklist from Airtable, we do this once when we start up the script
-# and with an update to the Airtable list, the bot will need to be restarted.
+        self.r = praw.Reddit(client_id = self.client_id,
+                             client_secret = self.client_secret,
+                             password = self.user_pass,
+                             user_agent = self.user_agent,
+                             username = self.user_name)
+        # user.me() is an API round trip, only make it when someone is listening
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s", self.r.user.me())
+
+# This is a function to get the inklist from Airtable.  It runs once at startup and
+# again from the background refresh thread, so Airtable edits no longer need a restart.
     def __get_inklist(self):
-        #if self.debug:
-        #    print("Airtable Login")
-        at = airtable.Airtable(self.at_base, self.at_key)
+        # Talk to the Airtable REST API directly over one keep-alive session.  The
+        # old airtable wrapper could open a fresh connection (TLS handshake and
+        # all) for every page of the pagination loop; a Session reuses one, and
+        # Airtable will gzip the responses for us.
+        session = requests.Session()
+        session.headers['Authorization'] = 'Bearer {}'.format(self.at_key)
+        session.headers['Accept-Encoding'] = 'gzip'
+        url = 'https://api.airtable.com/v0/{}/{}'.format(self.at_base, self.at_table)
         ink_list = []
-        #if self.debug:
-        #    print("Airtable get Table")
-        at_inkbot = at.get(self.at_table)
-        offset = at_inkbot.get('offset')
-        ink_list.append(at_inkbot['records'])
-        while offset:
-            #if self.debug:
-            #   print("Airtable get Offset loop")
-            at_inkbot = at.get(self.at_table, offset=offset)
-            offset = at_inkbot.get('offset')
-            ink_list.append(at_inkbot['records'])
+        offset = None
+        while True:
+            # Only ask for the columns the bot reads; anything else is payload
+            # we would transfer and json-decode just to ignore
+            params = [('fields[]', f) for f in ('Brand+ink regex', 'Name',
+                                               'Scanned Page', 'Imgur Address')]
+            if offset:
+                params.append(('offset', offset))
+            page = session.get(url, params=params, timeout=30).json()
+            ink_list.extend(page['records'])
+            offset = page.get('offset')
+            if not offset:
+                break
         return ink_list
 
+# Fuse every ink regex from the Airtable into a single alternation pattern.  Scanning a
+# [[token]] is then one call into the C regex engine instead of one re.search per ink,
+# and the matched group name tells us which ink it was.  An ink whose regex does not
+# compile on its own is skipped so one bad Airtable row cannot take the whole list down.
+#
+# Everything derived from the inklist (combined pattern, prefilter, hyperscan db, the
+# lru cache) lives inside the returned closure, so swapping in a freshly built matcher
+# is one attribute assignment and the main loop always sees a consistent snapshot.
+    def __compile_inklist(self, inklist):
+        parts = []
+        group_map = {}
+        patterns = []
+        pattern_inks = []
+        # Patterns with backreferences or named groups of their own can't join
+        # the fused alternation; they keep their own compiled regex here and
+        # are scanned individually.
+        solo_res = []
+        solo_patterns = []
+        # Buckets of pattern sources keyed by the first letter of the brand
+        # literal; patterns with no stable literal go under '*'.  Used by the
+        # pure-stdlib fallback below.
+        letter_parts = {}
+        star_parts = []
+        for i, ink in enumerate(inklist):
+            pattern = ink['fields'].get('Brand+ink regex')
+            if not pattern:
+                continue
+            group = 'ink_{}'.format(i)
+            # Tokens are lowercased before scanning, so lower the pattern at
+            # compile time too and skip IGNORECASE's per-byte case folding.
+            # Patterns with letter escapes are not safe to lower (\B quietly
+            # becomes \b), those keep case-insensitivity scoped to themselves;
+            # lowering can also break syntax outright ((?P<name> turns into
+            # the invalid (?p<name>), so prove the lowered candidate still
+            # compiles and fall back to the scoped flag when it doesn't.
+            if _ESCAPE_LETTER_RE.search(pattern):
+                part = '(?i:{})'.format(pattern)
+            else:
+                part = pattern.lower()
+                try:
+                    re.compile(part)
+                except re.error:
+                    part = '(?i:{})'.format(pattern)
+            # Anchor to the brackets exactly as the baseline did with
+            # '\[\[' + regex + '\]\]': the ink's regex has to cover the whole
+            # bracketed name.  This keeps "[[diamine bluebird]]" from matching
+            # a "Diamine Blue" ink, and makes alternation order irrelevant,
+            # since only alternatives spanning bracket to bracket can match.
+            if _UNFUSABLE_RE.search(pattern):
+                # Backreferences and named groups worked in the baseline's
+                # per-ink re.search but poison a fused alternation (groups
+                # collide, backrefs renumber), so these few scan on their
+                # own.  Anchored bare, with no group wrapper: a wrapper
+                # would itself become group 1 and steal any \1 inside.
+                try:
+                    solo = re.compile(r'\[\[(?:{})\]\]'.format(part))
+                except re.error:
+                    log.debug("Skipping ink with bad regex: %s", pattern)
+                    continue
+                ink['_link_line'] = self.__make_link_line(ink)
+                solo_res.append((solo, ink))
+                solo_patterns.append(pattern)
+                continue
+            named_part = r'(?P<{}>\[\[(?:{})\]\])'.format(group, part)
+            # Validate the exact source that gets joined - group wrapper,
+            # anchoring and all - not the raw pattern; the transforms above
+            # are what actually end up in the fused compile.  A row that
+            # fails here is skipped just like a bad raw pattern used to be.
+            try:
+                re.compile(named_part)
+            except re.error:
+                log.debug("Skipping ink with bad regex: %s", pattern)
+                continue
+            # The name/url fields never change after download, so build the
+            # markdown reply line for this ink once right here
+            ink['_link_line'] = self.__make_link_line(ink)
+            parts.append(named_part)
+            group_map[group] = ink
+            patterns.append(pattern)
+            pattern_inks.append(ink)
+            m = _LITERAL_PREFIX_RE.match(pattern)
+            first = m.group(0).strip()[:1].lower() if m else ''
+            # An alternation or group right after the literal ("Pilot|Namiki
+            # Blue") means a match need not contain the literal at all, so the
+            # first letter isn't reliable; such patterns go in the '*' bucket,
+            # which is always scanned
+            if m and pattern[m.end():m.end() + 1] in ('|', '('):
+                first = ''
+            if first.isalpha():
+                letter_parts.setdefault(first, []).append(named_part)
+            else:
+                star_parts.append(named_part)
+        combined_re = None
+        combined_is_re2 = False
+        if parts:
+            combined_src = '|'.join(parts)
+            # Prefer RE2 when it is installed; it rejects backreferences and a
+            # few other constructs, so fall back to re if the compile fails
+            if re2 is not None:
+                try:
+                    combined_re = re2.compile(combined_src)
+                    combined_is_re2 = True
+                except Exception as e:
+                    log.debug("RE2 compile failed, using re: %s", e)
+            if combined_re is None:
+                try:
+                    combined_re = re.compile(combined_src)
+                except re.error as e:
+                    # Every part was validated above, so this should be
+                    # unreachable - but a fused compile failure has to
+                    # degrade to per-ink scans, not kill the bot at startup
+                    log.debug("Fused compile failed, scanning per ink: %s", e)
+                    solo_res.extend(
+                        (re.compile(p), pink)
+                        for p, pink in zip(parts, pattern_inks))
+                    parts = []
+        ac = self.__build_prefilter(patterns + solo_patterns)
+        hs_db = None
+        hs_inks = []
+        # If hyperscan is installed, compile the same patterns into one of its
+        # databases.  It can reject constructs that re accepts (backreferences
+        # and friends), so on any compile error we just keep the re fallback.
+        if hyperscan is not None and patterns:
+            try:
+                db = hyperscan.Database()
+                flag = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+                # same bracket anchoring as the re patterns above
+                db.compile(expressions=[r'\[\[(?:{})\]\]'.format(p).encode()
+                                        for p in patterns],
+                           ids=list(range(len(patterns))),
+                           flags=[flag] * len(patterns))
+                hs_db = db
+                hs_inks = pattern_inks
+            except Exception as e:
+                log.debug("Hyperscan compile failed, using re: %s", e)
+
+        # Pure-stdlib fallback: when neither hyperscan nor RE2 is installed the
+        # combined pattern runs on re's backtracking engine, which pays for every
+        # alternative at every position.  Bucket the patterns by the first letter
+        # of their brand literal and compile one small alternation per bucket; at
+        # match time only the buckets whose letter appears in the token need to
+        # be scanned.  A match's brand letter is always in the token, so this
+        # narrowing can never miss anything the full pattern would find.
+        letter_res = None
+        star_re = None
+        if parts and hs_db is None and combined_is_re2 is False and letter_parts:
+            letter_res = {k: re.compile('|'.join(v)) for k, v in letter_parts.items()}
+            if star_parts:
+                star_re = re.compile('|'.join(star_parts))
+
+        # Scan one lowercased [[token]] and return the ink whose regex made the
+        # longest match, or None.  Callers pass token.lower() so the lru cache
+        # sees one key per ink and repeat tokens never rerun a scan.
+        def find_best_match(token):
+            # Rule the token out with the brand prefilter before any regex work
+            if ac is not None:
+                for _ in ac.iter(token):
+                    break
+                else:
+                    return None
+            best_ink = None
+            best_len = 0
+            if hs_db is not None:
+                matches = []
+                def on_match(match_id, start, end, flags, context):
+                    matches.append((end - start, match_id))
+                hs_db.scan(token.encode(), match_event_handler=on_match)
+                if matches:
+                    best_len, match_id = max(matches)
+                    best_ink = hs_inks[match_id]
+            elif combined_re is not None:
+                if letter_res is not None:
+                    to_scan = [letter_res[ch] for ch in set(token) if ch in letter_res]
+                    if star_re is not None:
+                        to_scan.append(star_re)
+                else:
+                    to_scan = [combined_re]
+                best = None
+                for creg in to_scan:
+                    for m in creg.finditer(token):
+                        if len(m.group(0)) > best_len:
+                            best_len = len(m.group(0))
+                            best = m.lastgroup
+                if best is not None:
+                    best_ink = group_map[best]
+            # The few unfusable patterns always get their own scans, with
+            # longest-match-wins still holding across the whole set
+            for creg, solo_ink in solo_res:
+                for m in creg.finditer(token):
+                    if len(m.group(0)) > best_len:
+                        best_len = len(m.group(0))
+                        best_ink = solo_ink
+            return best_ink
+
+        # The same popular inks get asked about over and over, so memoize
+        # token -> ink.  A rebuilt matcher starts with an empty cache, so a
+        # refreshed inklist can never serve stale answers.
+        return functools.lru_cache(maxsize=2048)(find_best_match)
+
+# Re-download and recompile the inklist every refresh_interval seconds.  Runs on a
+# daemon thread; the swap at the bottom is a plain attribute store, which is atomic,
+# so no locking is needed against the main loop.
+    def __refresh_inklist_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                inklist = self.__get_inklist()
+                find_cached = self.__compile_inklist(inklist)
+            except Exception as e:
+                log.debug("Inklist refresh failed, keeping old list: %s", e, exc_info=True)
+                continue
+            log.debug("Refreshed inklist from Airtable")
+            self.inklist = inklist
+            self._find_cached = find_cached
+
+# Build the reply line for one ink, or None if it is missing a name or a url.
+# Same format as always: a markdown bullet linking the ink name to its image.
+    def __make_link_line(self, ink):
+        fields = ink['fields']
+        name = fields.get('Name')
+        if self.version == 4 and 'Scanned Page' in fields:
+            url = fields['Scanned Page'][0]['url']
+        else:
+            url = fields.get('Imgur Address')
+        if not name or not url:
+            return None
+        return '*  [' + name + '](' + url + ')   \n'
+
+# Build an Aho-Corasick automaton over the literal brand prefix of every ink regex
+# (e.g. "Pilot", "Diamine").  Most tokens match no ink at all, and one linear pass of
+# the automaton rules those out before the heavier regex scan.  Only safe when every
+# pattern starts with a usable literal, otherwise the prefilter stays disabled.
+    def __build_prefilter(self, patterns):
+        if ahocorasick is None or not patterns:
+            return None
+        ac = ahocorasick.Automaton()
+        for pattern in patterns:
+            m = _LITERAL_PREFIX_RE.match(pattern)
+            if not m:
+                return None
+            literal = m.group(0)
+            # An alternation or group right after the literal ("Pilot|Namiki
+            # Blue") means a match need not contain the literal at all, so it
+            # can't be used as a gate - disable the prefilter like we do for
+            # patterns with no usable literal
+            if pattern[m.end():m.end() + 1] in ('|', '('):
+                return None
+            # A quantifier right after the literal makes its last character optional
+            if m.end() < len(pattern) and pattern[m.end()] in '*?{':
+                literal = literal[:-1]
+            literal = literal.strip().lower()
+            if len(literal) < 3:
+                return None
+            ac.add_word(literal, literal)
+        ac.make_automaton()
+        return ac
+
 # This is the function to reply to comments, comment out the comment.reply line to be able to test
 # without posting to the subreddit, if self.debug == True, it will print to the command line the 
 # output
     def __reply_to(self, comment, output, sid):
         # Debug prints, show up on the host running this bot
-        if self.debug:
-            print("\n---------------------------------------------")
-            print("%s" %(output))
-            print("\n---------------------------------------------")
+        log.debug("\n---------------------------------------------\n%s"
+                  "\n---------------------------------------------", output)
         comment.reply(output)
         self.PostList[sid] = 1
-        self.PostList.sync()
+        self._replied.add(sid)
 
 # This is the action that is performed on a comment when it is detected.
     def __comment_action(self, c):
-        regex = r"\[\[.*?\]\]"
         text = c.body
-        output = ''
-        comment_ID = c.id
-        sid = str(c.id)
-    
-        # We will enter this if statement only if the [[ink name]] is found in the body of the post, else we just move on
-        if re.search(regex, text):
-           # Next we check to see if we have processed this comment in the past
-           if sid not in self.PostList:
+        # Reddit markdown often escapes the brackets ("\[\[ink\]\]"), strip the
+        # backslashes so those tokens still match.  translate with the prebuilt
+        # table is a single C pass, and comments without one skip it entirely.
+        if '\\' in text:
+            text = text.translate(_STRIP_BACKSLASH)
+        # praw comment ids are already str, no need to convert
+        sid = c.id
+
+        # Nearly every comment has no [[ink name]] at all.  A plain substring
+        # check is a tight C loop and skips the regex entirely on that path.
+        if "[[" not in text:
+            return
+        # Next we check to see if we have processed this comment in the past
+        if sid not in self._replied:
               # Now we create a list with all of the matches in the body of the comment
-              matchList = re.findall(regex, text)
-              found_match = 0 
+              matchList = _TOKEN_RE.findall(text)
+              # Collect the reply lines in a list and join once at the end;
+              # string += in a loop re-copies the whole reply every time
+              reply_lines = []
+              # Grab the current matcher once so a background refresh mid-comment
+              # cannot hand us a mix of old and new inklists
+              find_best = self._find_cached
               # At this point, we are ready to go over every match found and compare them to our inklist regex for commenting
               for match in matchList:
-                  # Walk over the inklist, it is a list of lists, so we need two for loops
-                  for atrecord in self.inklist:
-                      for ink in atrecord:
-                          # Build up the regex, pulled from the Airtable
-                          temp_reg='\[\[' + ink['fields']['Brand+ink regex'] + '\]\]'
-                          #temp_url=ink['fields']['Scanned Page'].url()
-                          #print("%s" %(temp_url))
-                          # Build up the replacement string from Airtable
-                          if self.version == 4:
-                              if 'Scanned Page' in ink['fields']:
-                                  temp_replace='*  [' + ink['fields']['Name'] + '](' + ink['fields']['Scanned Page'][0]['url'] + ')   \n'
-                              else:
-                                  temp_replace='*  [' + ink['fields']['Name'] + '](' + ink['fields']['Imgur Address'] + ')   \n'
-                          else:
-                              temp_replace='*  [' + ink['fields']['Name'] + '](' + ink['fields']['Imgur Address'] + ')   \n'
-                          # will enter this if statement if the specific match from the comment matches this Airtable entry
-                          if re.search(temp_reg, match, flags=re.IGNORECASE):
-                              if self.debug:
-                                  print("Found Match")
-                              found_match = 1 
-                              new_match= re.sub(temp_reg, temp_replace, match, 0, flags=re.IGNORECASE)
-                              output = output + new_match
+                  # One scan of the combined pattern picks the best ink for this
+                  # token; case-fold here so the cache sees one key per ink
+                  ink = find_best(match.lower())
+                  if ink is None or ink['_link_line'] is None:
+                      continue
+                  log.debug("Found Match")
+                  reply_lines.append(ink['_link_line'])
               # After processing all matches, and building up the output, post
-              if found_match == 1:
-                 # retries for if reddit says we are posting too much, this gives us a 20min retry for posts
-                 retries = 20
-                 while retries != 0:
+              if reply_lines:
+                 output = ''.join(reply_lines)
+                 # Retry when reddit says we are posting too much.  Rather than a
+                 # fixed wait_time sleep per attempt, honor the rate-limit reset
+                 # reddit sends back and otherwise back off exponentially, capped
+                 # at wait_time, all on the same overall time budget as before.
+                 deadline = time.monotonic() + 20 * self.wait_time
+                 attempt = 0
+                 while True:
                     try:
                        # Post comment to reddit and add this post ID to our responded to comment database
                        self.__reply_to(c, output, sid)
                        break  # exit the loop
                     except Exception as e:
-                       if self.debug:
-                           traceback.print_exc()
-                           print("######Sleep Exception######")
-                       time.sleep(self.wait_time)
-                       retries -= 1
-                       if retries == 0:
-                           self.___handle_exception(e)
+                       log.debug("######Sleep Exception######", exc_info=True)
+                       if time.monotonic() >= deadline:
+                           # out of time, let the main loop sleep and restart the stream
+                           raise
+                       delay = min(self.wait_time, 2 ** attempt)
+                       # reddit sends x-ratelimit-reset (seconds left in the
+                       # whole quota window) on every response, so only trust it
+                       # when the error really is a 429 rate limit; sleeping the
+                       # window for a transient 503 would stall for minutes
+                       response = getattr(e, 'response', None)
+                       if response is not None and getattr(response, 'status_code', None) == 429:
+                           reset = response.headers.get('x-ratelimit-reset')
+                           try:
+                               delay = max(1.0, float(reset))
+                           except (TypeError, ValueError):
+                               pass
+                       time.sleep(delay)
+                       attempt += 1
 
+# Run the comment stream forever.  When things go bad (reddit flaking, network
+# hiccups) we used to recurse back through start(), which re-downloaded the whole
+# Airtable and recompiled every regex on each blip, and grew the stack while doing
+# it.  Now we just sleep the wait time and restart the stream; the inklist, the
+# compiled patterns, and the PostList all survive the retry.
     def __inkbot_loop(self):
-        try:
-            # Start the comment stream for processesing
-            # DELETE ME--Old methodology, keep for now, delete line next update
-            #for self.comment in praw.helpers.comment_stream(self.r, self.subreddit, limit=self.limit):
-            for self.comment in self.r.subreddit(self.subreddit).stream.comments():
-                self.__comment_action(self.comment)
-        except (KeyboardInterrupt, SystemExit):
-            if self.debug:
-                print("\nKeyboard exit or System Exit, closing DB file\n")
-            self.PostList.close()
-            raise
-        except Exception as e:
-            self.___handle_exception(e)
+        while True:
+            try:
+                # Start the comment stream for processesing
+                # skip_existing stops praw from replaying the ~100 most recent comments
+                # every time the stream (re)starts; we would only reject them against
+                # the PostList anyway
+                for self.comment in self.r.subreddit(self.subreddit).stream.comments(skip_existing=True):
+                    self.__comment_action(self.comment)
+            except (KeyboardInterrupt, SystemExit):
+                log.debug("\nKeyboard exit or System Exit, closing DB file\n")
+                self.PostList.close()
+                raise
+            except Exception as e:
+                log.debug("Inkbot had an Error: %s, going to try and continue", e, exc_info=True)
+                time.sleep(self.wait_time)
 
 
 
@@ -1,27 +1,40 @@
 #!/usr/bin/python3
 
+import logging
+from logging import StreamHandler
+from logging.handlers import MemoryHandler
+
 from inkbot import InkBot
+from utils import read_config, populate_config, write_config
+
+# Buffer debug records in memory and flush them to the console in batches of 100
+# (errors flush immediately), instead of a write+flush per line in the match loop.
+# The handler goes on root, but DEBUG is enabled on the "inkbot" logger only -
+# root at DEBUG would pull in praw/urllib3 chatter and override the debug= gate
+# in InkBot.__init__, which relies on the logger inheriting a quieter root level.
+logging.basicConfig(
+    handlers=[MemoryHandler(100, flushLevel=logging.ERROR, target=StreamHandler())])
+logging.getLogger("inkbot").setLevel(logging.DEBUG)
 
+# Load saved credentials; on the first run, prompt for everything in
+# template.ini and save the answers for next time
+config = read_config()
+if not config.sections():
+    config = populate_config(config=config)
+    write_config(config, overwrite=True)
 
-user_agent = ("<User Agent Here>")
-at_base = ('<AirTable Base Here>')
-at_key = ('<AirTable Key Here>')
-at_table = ('<AirTable Table ID here>')
-bot_user = ("<User Name Here>")
-bot_passwd = ("<User Passwd Here>")
-bot_id = ("<Client ID Here>")
-bot_secret = ("<Client Secret Here>")
-subreddit = ("<Subreddit Here>")
+reddit = config["reddit"]
+airtable = config["airtable"]
 
-myinkbot = InkBot( user_agent = user_agent,
-                   user_name  = bot_user,
-                   user_pass  = bot_passwd,
-                   client_id  = bot_id,
-                   client_secret = bot_secret,
-                   at_key     = at_key,
-                   at_base    = at_base,
-                   at_table   = at_table,
-                   subreddit  = subreddit,
+myinkbot = InkBot( user_agent = reddit["user_agent"],
+                   user_name  = reddit["user_name"],
+                   user_pass  = reddit["user_pass"],
+                   client_id  = reddit["client_id"],
+                   client_secret = reddit["client_secret"],
+                   at_key     = airtable["at_key"],
+                   at_base    = airtable["at_base"],
+                   at_table   = airtable["at_table"],
+                   subreddit  = reddit["subreddit"],
                    debug=True )
 
 myinkbot.start()
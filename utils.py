@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+
+# Helpers for finding, reading, and writing inkbot's config file, so credentials
+# no longer have to be pasted into inkbot_run.py itself.
+
+# configparser and getpass are imported lazily inside the functions that need
+# them: configparser's import is not cheap, and a run that only needs
+# get_inkbot_dir (or hits the pickled prompt schedule) shouldn't pay for either.
+import functools
+import io
+import os
+import pickle
+from pathlib import Path
+
+# Options matching this are prompted for with getpass and can be stripped out
+# when writing a shareable copy of the config.  Deliberately unrolled: for three
+# keywords this short, the C-level substring checks with or-short-circuiting are
+# cheaper than a generator frame or a regex engine call.  "pass" goes first as
+# the most common hit.  Callers pass the option name already lowercased.
+def _is_secret(opt_lower):
+    return ("pass" in opt_lower) or ("key" in opt_lower) or ("secret" in opt_lower)
+
+
+# The config lives in the platform's usual per-user data directory.  Constant-
+# folded at import: the platform and home directory can't change mid-process.
+# Note os.name, not sys.platform - "win" in sys.platform also matched "darwin",
+# which would have sent macOS users looking for %APPDATA%.
+_IS_WIN = os.name == "nt"
+_BASE = Path(os.environ["APPDATA"]) if _IS_WIN else Path.home() / ".local" / "share"
+_INKBOT_DIR = _BASE / "inkbot"
+
+
+# Memoized so the mkdir happens once per process, on first use rather than at import
+@functools.lru_cache(maxsize=1)
+def get_inkbot_dir():
+    _INKBOT_DIR.mkdir(parents=True, exist_ok=True)
+    return _INKBOT_DIR
+
+
+# Read inkbot.ini (or the given path), returning an empty ConfigParser when no
+# config has been written yet.
+def read_config(cfg_path=None):
+    import configparser
+    if cfg_path is None:
+        cfg_path = get_inkbot_dir() / "inkbot.ini"
+    cfg_path = Path(cfg_path)
+    # interpolation=None throughout this module: the config holds raw
+    # credentials, and BasicInterpolation would choke on a perfectly good
+    # password containing "%"
+    config = configparser.ConfigParser(interpolation=None)
+    # Open directly and let a missing file raise, instead of a stat via
+    # is_file() followed by the open; read_file on the handle also skips
+    # ConfigParser.read's filename-list machinery
+    try:
+        with cfg_path.open("r", encoding="utf-8") as hdl:
+            config.read_file(hdl)
+    except FileNotFoundError:
+        pass
+    return config
+
+
+# Write the config to disk.  The default path is resolved at call time rather
+# than in the signature, so importing this module never creates the config
+# directory as a side effect.  secrets=False strips secret-looking options
+# first, for writing a copy that is safe to share.
+def write_config(config, out_pth=None, overwrite=False, secrets=True):
+    if out_pth is None:
+        out_pth = get_inkbot_dir() / "inkbot.ini"
+    elif not isinstance(out_pth, Path):
+        # only coerce strings; the default above and most callers already hand
+        # us a Path, and PurePath.__init__ re-parses the whole string
+        out_pth = Path(out_pth)
+    if not secrets:
+        # Copy the non-secret options into a fresh parser and write that,
+        # leaving the caller's config intact - stripping secrets for a
+        # shareable file shouldn't also strip them from the in-memory config.
+        # Reading _sections directly still skips remove_option's per-call
+        # optionxform and section lookups, and read_dict builds the copy in
+        # one linear pass.
+        import configparser
+        filtered = configparser.ConfigParser(interpolation=None)
+        filtered.read_dict(
+            {section: {option: value
+                       for option, value in config._sections[section].items()
+                       if not _is_secret(option.lower())}
+             for section in config.sections()})
+        config = filtered
+    # Serialize to memory first - config.write makes lots of little writes -
+    # so the file lands in a single payload write either way below
+    buf = io.StringIO()
+    config.write(buf)
+    text = buf.getvalue()
+    if overwrite:
+        # temp file + atomic rename, a crash mid-save can never leave a torn
+        # inkbot.ini behind
+        tmp_pth = out_pth.with_suffix(out_pth.suffix + ".tmp")
+        tmp_pth.write_text(text, encoding="utf-8")
+        os.replace(tmp_pth, out_pth)
+    else:
+        # exclusive create replaces the old stat-then-open dance: one syscall,
+        # and no race window where someone else's file gets clobbered
+        try:
+            with out_pth.open("x", encoding="utf-8") as hdl:
+                hdl.write(text)
+        except FileExistsError as e:
+            raise OSError("File already exists at {}.".format(out_pth)) from e
+
+
+# Parse the prompt template once per (path, mtime) and share the result across
+# populate_config calls.  The template never gets mutated here (answers land in
+# the caller's config), so handing out the same parsed object is safe, and an
+# edited template busts the cache through its mtime.
+@functools.lru_cache(maxsize=8)
+def _load_template(path, mtime):
+    import configparser
+    template = configparser.ConfigParser(interpolation=None)
+    template.read(path)
+    # sections() and options() copy their internal dicts on every call, so
+    # precompute the filtered view (no "test" sections) while we're here and
+    # carry it on the parsed object for every consumer of this cache entry
+    template._inkbot_sections = tuple(
+        s for s in template.sections() if "test" not in s)
+    template._inkbot_options = {
+        s: tuple(template.options(s)) for s in template._inkbot_sections}
+    return template
+
+
+# Compile the template down to a prompt schedule - one (section, option, prompt,
+# is_secret) tuple per question - and keep it pickled in the inkbot data dir
+# (not next to template.ini, which lives in the checkout and shouldn't be
+# dirtied), invalidated by the template's mtime.  The warm path is a pickle
+# load; no configparser parsing, section filtering, or secret matching at all.
+def _load_schedule(template_pth):
+    template_pth = Path(template_pth)
+    cache_pth = get_inkbot_dir() / (template_pth.name + ".schedule")
+    st = os.stat(template_pth)
+    try:
+        if os.stat(cache_pth).st_mtime >= st.st_mtime:
+            with cache_pth.open("rb") as hdl:
+                return pickle.load(hdl)
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+    template = _load_template(str(template_pth), st.st_mtime)
+    schedule = []
+    for section in template._inkbot_sections:
+        for option in template._inkbot_options[section]:
+            schedule.append((section, option,
+                             "{} {}: ".format(section, option),
+                             _is_secret(option.lower())))
+    # best effort - a failed cache write just means a cold load next time
+    try:
+        with cache_pth.open("wb") as hdl:
+            pickle.dump(schedule, hdl)
+    except OSError:
+        pass
+    return schedule
+
+
+# Walk the prompt schedule and ask for every option that isn't already present
+# in the given config, using getpass for the secret ones.  Returns the filled-in
+# ConfigParser; sections with "test" in the template are for local testing and
+# never make it into the schedule.
+def populate_config(template_pth=None, config=None):
+    if template_pth is None:
+        template_pth = Path(__file__).parent / "template.ini"
+    if config is None:
+        import configparser
+        config = configparser.ConfigParser(interpolation=None)
+    for section, option, prompt, is_secret in _load_schedule(template_pth):
+        # 'in' goes straight to ConfigParser.__contains__, a dict probe, where
+        # has_section is a method call doing the same thing
+        if section not in config:
+            config.add_section(section)
+        # reach into the parser's own dict; config[section] builds a fresh
+        # SectionProxy on every subscript just to do the same .get
+        opt_val = config._sections[section].get(option)
+        if opt_val:
+            continue
+        if is_secret:
+            from getpass import getpass
+            value = getpass(prompt)
+        else:
+            value = input(prompt)
+        config[section][option] = value
+    return config